@@ -8,14 +8,152 @@ Usage example:
 python arxiv_fetcher.py --keywords "machine learning,deep learning" --start-date "2024-01-01" --end-date "2024-12-31" --output "ml_papers_2024.md"
 """
 
-import urllib.request
 import urllib.parse
-import feedparser
 import argparse
+import functools
+import hashlib
+import json
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 import time
 
+import requests
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP session with connection pooling - reuses the TCP connection
+# to export.arxiv.org across batches instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                     max_retries=Retry(total=3, backoff_factor=1)))
+# Ask for compressed responses explicitly - the XML feeds shrink ~4x on
+# the wire, and decode_content in fetch_batch decompresses the stream
+SESSION.headers['Accept-Encoding'] = 'gzip, deflate'
+
+# Rate limiting for ArXiv API requests - allow at most one request start
+# every _RATE_INTERVAL seconds across all worker threads
+_RATE_INTERVAL = 0.3
+_rate_lock = threading.Lock()
+_next_request_time = 0.0
+
+def _rate_limit():
+    """Sleep only for the time remaining until the next request slot
+
+    Each caller reserves the next slot under the lock and then waits for
+    it outside the lock, so a request that already took longer than the
+    interval proceeds immediately and threads never block each other
+    while sleeping.
+    """
+    global _next_request_time
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_request_time)
+        _next_request_time = slot + _RATE_INTERVAL
+    if slot > now:
+        time.sleep(slot - now)
+
+# Target fields - Mathematics, Computer Science, Statistics. ArXiv
+# supports prefix matching on cat:, so three wildcard clauses replace
+# the ~80-clause explicit category list and keep the query URL short
+CATEGORY_QUERY = 'cat:math*+OR+cat:cs*+OR+cat:stat*'
+
+# On-disk cache for query results - repeated runs with the same keywords
+# and date range (e.g. CI reruns) skip the network entirely
+CACHE_DIR = os.path.expanduser('~/.cache/arxiv_fetcher')
+CACHE_TTL = 86400  # 24 hours
+
+def _cache_path(keywords, start_date, end_date, max_results, build_formatted):
+    """Build the cache file path for a query"""
+    key = repr((tuple(sorted(keywords)), start_date, end_date, max_results, build_formatted))
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f'{digest}.json')
+
+def _prune_expired_cache():
+    """Remove cache files older than the TTL"""
+    try:
+        for name in os.listdir(CACHE_DIR):
+            path = os.path.join(CACHE_DIR, name)
+            if os.path.getmtime(path) <= time.time() - CACHE_TTL:
+                os.remove(path)
+    except OSError:
+        pass
+
+def cached_query(func):
+    """Cache query results on disk for CACHE_TTL seconds
+
+    The wrapped function returns (papers, fetch_ok); results are only
+    written to the cache when every request completed, so a transient
+    network error can't poison the cache with an empty or partial list.
+    """
+    @functools.wraps(func)
+    def wrapper(keywords, start_date, end_date, max_results=1000, use_cache=True,
+                build_formatted=True):
+        if not use_cache:
+            papers, _ = func(keywords, start_date, end_date, max_results, build_formatted)
+            return papers
+
+        _prune_expired_cache()
+        path = _cache_path(keywords, start_date, end_date, max_results, build_formatted)
+        if os.path.exists(path) and os.path.getmtime(path) > time.time() - CACHE_TTL:
+            print(f"Using cached results from {path}")
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        papers, fetch_ok = func(keywords, start_date, end_date, max_results, build_formatted)
+        if fetch_ok:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(papers, f)
+        return papers
+    return wrapper
+
+# XML namespaces used by the ArXiv Atom feed
+_ATOM_NS = '{http://www.w3.org/2005/Atom}'
+_OPENSEARCH_NS = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+def _parse_feed(source):
+    """Incrementally parse an ArXiv Atom feed into the entry dicts the fetch loop expects
+
+    Reads from a file-like source so parsing starts while the response
+    body is still arriving, and extracts only the fields the downstream
+    code uses. Consumed elements are cleared so the in-memory tree stays
+    bounded by a single entry instead of the whole feed.
+    """
+    entries = []
+    total_results = 0
+
+    for _, elem in etree.iterparse(source, tag=(f'{_ATOM_NS}entry',
+                                                f'{_OPENSEARCH_NS}totalResults')):
+        if elem.tag == f'{_OPENSEARCH_NS}totalResults':
+            total_results = int(elem.text or 0)
+        else:
+            link = ''
+            for link_elem in elem.iterfind(f'{_ATOM_NS}link'):
+                if link_elem.get('rel') == 'alternate':
+                    link = link_elem.get('href', '')
+                    break
+            entries.append({
+                'id': elem.findtext(f'{_ATOM_NS}id', ''),
+                'title': elem.findtext(f'{_ATOM_NS}title', ''),
+                'summary': elem.findtext(f'{_ATOM_NS}summary', ''),
+                'published': elem.findtext(f'{_ATOM_NS}published', ''),
+                'authors': [{'name': name.text or ''} for name in elem.iter(f'{_ATOM_NS}name')],
+                'link': link,
+                'tags': [{'term': cat.get('term', '')} for cat in elem.iterfind(f'{_ATOM_NS}category')],
+            })
+
+        # Free the consumed element and any earlier siblings
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    return {'entries': entries, 'total_results': total_results}
+
 def parse_arxiv_url(url):
     """Extract paper ID from ArXiv URL"""
     ix = url.rfind('/')
@@ -27,24 +165,13 @@ def format_authors(authors):
         return ", ".join([author.get('name', '') for author in authors])
     return authors
 
+# Precompiled whitespace pattern shared by all clean_text calls
+_WS_RE = re.compile(r'\s+')
+
+@functools.lru_cache(maxsize=4096)
 def clean_text(text):
     """Clean text, remove extra whitespace"""
-    return re.sub(r'\s+', ' ', text.strip())
-
-def date_in_range(paper_date, start_date, end_date):
-    """Check if paper date is within specified range"""
-    try:
-        paper_dt = datetime.strptime(paper_date[:10], '%Y-%m-%d')
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-        return start_dt <= paper_dt <= end_dt
-    except:
-        return False
-
-def contains_keywords(text, keywords):
-    """Check if text contains keywords"""
-    text_lower = text.lower()
-    return any(keyword.lower() in text_lower for keyword in keywords)
+    return _WS_RE.sub(' ', text.strip())
 
 def extract_categories(entry):
     """Extract paper categories"""
@@ -62,8 +189,9 @@ def extract_categories(entry):
     
     return categories
 
+@functools.lru_cache(maxsize=1024)
 def format_categories(categories):
-    """Format category information"""
+    """Format category information (categories must be a tuple so results can be memoized)"""
     if not categories:
         return "Unknown"
     
@@ -82,39 +210,26 @@ def format_categories(categories):
     
     return "; ".join(formatted) if formatted else ", ".join(categories)
 
-def fetch_papers_by_keywords(keywords, start_date, end_date, max_results=1000):
+@cached_query
+def fetch_papers_by_keywords(keywords, start_date, end_date, max_results=1000,
+                             build_formatted=True):
     """
     Fetch papers based on keywords and date range
-    
+
     Args:
         keywords: List of keywords
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
         max_results: Maximum number of results
+        build_formatted: Also build the categories, formatted_categories
+            and pdf_link fields; consumers that don't render them can
+            pass False
+
+    Returns the collected papers and a flag saying whether every request
+    completed; cached_query unwraps the flag and skips caching failures.
     """
     base_url = 'http://export.arxiv.org/api/query?'
     papers = []
-    
-    # Define target fields - Mathematics, Computer Science, Statistics
-    target_categories = [
-        # Mathematics categories
-        'math.AG', 'math.AT', 'math.AP', 'math.CT', 'math.CA', 'math.CO', 'math.AC', 'math.CV',
-        'math.DG', 'math.DS', 'math.FA', 'math.GM', 'math.GN', 'math.GT', 'math.GR', 'math.HO',
-        'math.IT', 'math.KT', 'math.LO', 'math.MP', 'math.MG', 'math.NT', 'math.NA', 'math.OA',
-        'math.OC', 'math.PR', 'math.QA', 'math.RT', 'math.RA', 'math.SP', 'math.ST', 'math.SG',
-        
-        # Computer Science categories  
-        'cs.AI', 'cs.AR', 'cs.CC', 'cs.CE', 'cs.CG', 'cs.CL', 'cs.CR', 'cs.CV', 'cs.DB', 'cs.DC',
-        'cs.DL', 'cs.DM', 'cs.DS', 'cs.DC', 'cs.ET', 'cs.FL', 'cs.GL', 'cs.GR', 'cs.GT', 'cs.HC',
-        'cs.IR', 'cs.IT', 'cs.LG', 'cs.LO', 'cs.MS', 'cs.MA', 'cs.MM', 'cs.NI', 'cs.NE', 'cs.NA',
-        'cs.OS', 'cs.OH', 'cs.PF', 'cs.PL', 'cs.RO', 'cs.SI', 'cs.SE', 'cs.SD', 'cs.SC', 'cs.SY',
-        
-        # Statistics categories
-        'stat.AP', 'stat.CO', 'stat.ML', 'stat.ME', 'stat.OT', 'stat.TH'
-    ]
-
-    # Build category query
-    category_query = '+OR+'.join([f'cat:{cat}' for cat in target_categories])
 
     # Build keyword query - search in title and abstract
     keyword_query = '+OR+'.join([f'ti:{urllib.parse.quote(kw)}+OR+abs:{urllib.parse.quote(kw)}' for kw in keywords])
@@ -125,99 +240,141 @@ def fetch_papers_by_keywords(keywords, start_date, end_date, max_results=1000):
     date_query = f'submittedDate:[{start_dt}0000+TO+{end_dt}2359]'
 
     # Build combined query: (keyword query) AND (category query) AND (date query)
-    combined_query = f'({keyword_query})+AND+({category_query})+AND+{date_query}'
+    combined_query = f'({keyword_query})+AND+({CATEGORY_QUERY})+AND+{date_query}'
     
     print(f"Searching keywords: {', '.join(keywords)}")
     print(f"Search fields: Mathematics, Computer Science, Statistics")
     print(f"Date range: {start_date} to {end_date}")
     
-    start_index = 0
     results_per_batch = 100
-    
-    while start_index < max_results:
-        query = f'search_query={combined_query}&sortBy=submittedDate&sortOrder=descending&start={start_index}&max_results={results_per_batch}'
-        
+
+    # Encode the full query string once; the loop only appends the start
+    # offset instead of re-formatting the ~2KB query per batch. The safe
+    # set preserves ArXiv's '+' separators and the pre-quoted keywords.
+    query_prefix = urllib.parse.urlencode({
+        'search_query': combined_query,
+        'sortBy': 'submittedDate',
+        'sortOrder': 'descending',
+        'max_results': results_per_batch,
+    }, safe='+:[]()*%')
+
+    def fetch_batch(start_index):
+        """Fetch and parse a single page of results"""
+        query = f'{query_prefix}&start={start_index}'
+        print(f"Fetching batch {start_index//results_per_batch + 1}...")
+        _rate_limit()
+        with SESSION.get(base_url + query, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return _parse_feed(response.raw)
+
+    # Track ids already collected - sortBy=submittedDate pagination can
+    # return overlapping entries when new submissions shift the offset
+    seen_ids = set()
+
+    def process_batch(parsed):
+        """Filter a parsed batch and append matching papers"""
+        batch_count = 0
+        for entry in parsed['entries']:
+            # The query already filters by date and keywords server-side;
+            # only guard against timezone drift at the range edges. ISO
+            # dates compare correctly as plain strings.
+            published_date = entry.get('published', '')[:10]
+            if not (start_date <= published_date <= end_date):
+                continue
+
+            # Skip entries duplicated across overlapping batches
+            paper_id = parse_arxiv_url(entry.get('id', ''))
+            if paper_id in seen_ids:
+                continue
+            seen_ids.add(paper_id)
+
+            paper = {
+                'id': paper_id,
+                'title': clean_text(entry.get('title', '')),
+                'authors': format_authors(entry.get('authors', [])),
+                'published': published_date,
+                'summary': clean_text(entry.get('summary', '')),
+                'link': entry.get('link', ''),
+            }
+            if build_formatted:
+                categories = extract_categories(entry)
+                paper['categories'] = categories
+                paper['formatted_categories'] = format_categories(tuple(categories))
+                paper['pdf_link'] = entry.get('link', '').replace('/abs/', '/pdf/') + '.pdf'
+            papers.append(paper)
+            batch_count += 1
+
+        print(f"Found {batch_count} relevant papers in this batch")
+
+    try:
+        # Probe the first batch to learn the total result count
+        parsed = fetch_batch(0)
+    except Exception as e:
+        print(f"Request error: {e}")
+        return papers, False
+
+    if not parsed['entries']:
+        print("No more results found")
+        return papers, True
+
+    process_batch(parsed)
+
+    # A short page means the server has no more results, whatever the
+    # reported total says - skip the remaining requests entirely
+    if len(parsed['entries']) < results_per_batch:
+        return papers, True
+
+    total_results = parsed['total_results']
+    remaining_starts = range(results_per_batch, min(total_results, max_results), results_per_batch)
+
+    if remaining_starts:
+        # Fetch the remaining pages concurrently; _rate_limit keeps the
+        # workers within ArXiv's request rate guidelines
         try:
-            print(f"Fetching batch {start_index//results_per_batch + 1}...")
-            
-            with urllib.request.urlopen(base_url + query) as response:
-                data = response.read()
-            
-            parsed = feedparser.parse(data)
-            
-            if not parsed.entries:
-                print("No more results found")
-                break
-            
-            batch_count = 0
-            for entry in parsed.entries:
-                # Check if publication date is within range
-                published_date = entry.get('published', '')
-                if not date_in_range(published_date, start_date, end_date):
-                    continue
-                
-                # Check if title and abstract contain keywords
-                title = entry.get('title', '')
-                summary = entry.get('summary', '')
-                
-                if contains_keywords(title, keywords) or contains_keywords(summary, keywords):
-                    paper_id = parse_arxiv_url(entry.get('id', ''))
-                    categories = extract_categories(entry)
-                    
-                    paper = {
-                        'id': paper_id,
-                        'title': clean_text(title),
-                        'authors': format_authors(entry.get('authors', [])),
-                        'published': published_date[:10],  # Keep only date part
-                        'summary': clean_text(summary),
-                        'categories': categories,
-                        'formatted_categories': format_categories(categories),
-                        'link': entry.get('link', ''),
-                        'pdf_link': entry.get('link', '').replace('/abs/', '/pdf/') + '.pdf'
-                    }
-                    papers.append(paper)
-                    batch_count += 1
-            
-            print(f"Found {batch_count} relevant papers in this batch")
-            
-            start_index += results_per_batch
-            
-            # Avoid too frequent requests
-            time.sleep(1)
-            
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for parsed in executor.map(fetch_batch, remaining_starts):
+                    process_batch(parsed)
+                    if len(parsed['entries']) < results_per_batch:
+                        break
         except Exception as e:
             print(f"Request error: {e}")
-            break
-    
-    return papers
+            return papers, False
+
+    return papers, True
 
 def save_to_markdown(papers, output_file, keywords, start_date, end_date):
     """Save papers to Markdown format"""
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        # Write title and statistics
-        f.write(f"# ArXiv Paper Search Results\n\n")
-        f.write(f"**Search Keywords**: {', '.join(keywords)}\n\n")
-        f.write(f"**Search Fields**: Mathematics, Computer Science, Statistics\n\n")
-        f.write(f"**Date Range**: {start_date} to {end_date}\n\n")
-        f.write(f"**Papers Found**: {len(papers)}\n\n")
-        f.write(f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-        f.write("---\n\n")
-        
-        # Sort by publication date
-        papers.sort(key=lambda x: x['published'], reverse=True)
-        
-        # Write paper list
-        for i, paper in enumerate(papers, 1):
-            f.write(f"## {i}. {paper['title']}\n\n")
-            f.write(f"**Authors**: {paper['authors']}\n\n")
-            f.write(f"**Published**: {paper['published']}\n\n")
-            f.write(f"**Categories**: {paper['formatted_categories']}\n\n")
-            f.write(f"**ArXiv ID**: {paper['id']}\n\n")
-            f.write(f"**Links**: [View Paper]({paper['link']}) | [Download PDF]({paper['pdf_link']})\n\n")
-            f.write(f"**Abstract**:\n{paper['summary']}\n\n")
-            f.write("---\n\n")
-    
+
+    # Build title and statistics
+    parts = [
+        f"# ArXiv Paper Search Results\n\n",
+        f"**Search Keywords**: {', '.join(keywords)}\n\n",
+        f"**Search Fields**: Mathematics, Computer Science, Statistics\n\n",
+        f"**Date Range**: {start_date} to {end_date}\n\n",
+        f"**Papers Found**: {len(papers)}\n\n",
+        f"**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+        "---\n\n",
+    ]
+
+    # Sort by publication date
+    papers.sort(key=itemgetter('published'), reverse=True)
+
+    # Build paper list
+    for i, paper in enumerate(papers, 1):
+        parts.append(f"## {i}. {paper['title']}\n\n")
+        parts.append(f"**Authors**: {paper['authors']}\n\n")
+        parts.append(f"**Published**: {paper['published']}\n\n")
+        parts.append(f"**Categories**: {paper['formatted_categories']}\n\n")
+        parts.append(f"**ArXiv ID**: {paper['id']}\n\n")
+        parts.append(f"**Links**: [View Paper]({paper['link']}) | [Download PDF]({paper['pdf_link']})\n\n")
+        parts.append(f"**Abstract**:\n{paper['summary']}\n\n")
+        parts.append("---\n\n")
+
+    # Emit the whole document in one buffered write
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(''.join(parts))
+
     print(f"Results saved to: {output_file}")
 
 def main():
@@ -232,6 +389,8 @@ def main():
                        help='Output filename (default: arxiv_papers.md)')
     parser.add_argument('--max-results', type=int, default=1000,
                        help='Maximum number of search results (default: 1000)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Bypass the on-disk query cache and always fetch from ArXiv')
     
     args = parser.parse_args()
     
@@ -247,7 +406,8 @@ def main():
         return
     
     # Fetch papers
-    papers = fetch_papers_by_keywords(keywords, args.start_date, args.end_date, args.max_results)
+    papers = fetch_papers_by_keywords(keywords, args.start_date, args.end_date, args.max_results,
+                                      use_cache=not args.no_cache)
     
     if papers:
         # Save to Markdown
@@ -3,6 +3,8 @@ import sys
 import re
 import datetime
 import argparse
+import json
+import mmap
 
 # --- 1. dynamically import arxiv_fetcher from parent directory ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,21 +19,46 @@ except ImportError:
 
 # --- 2. helper functions ---
 
+# ids already published are remembered between runs so reruns on the
+# same day don't reprocess (and re-append) the same papers
+SEEN_IDS_RETENTION_DAYS = 90
+
+def _seen_ids_path(target_dir):
+    return os.path.join(target_dir, 'archives', '.seen_ids.json')
+
+def load_seen_ids(target_dir):
+    """Load the already-published paper ids mapped to their publish dates"""
+    try:
+        with open(_seen_ids_path(target_dir), 'r', encoding='utf-8') as f:
+            seen = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # keep the file bounded: drop ids older than the retention window
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=SEEN_IDS_RETENTION_DAYS)
+    cutoff_str = cutoff.strftime("%Y-%m-%d")
+    return {pid: date for pid, date in seen.items() if date >= cutoff_str}
+
+def save_seen_ids(target_dir, seen):
+    """Persist the published paper ids for the next run"""
+    path = _seen_ids_path(target_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(seen, f)
+
+# match https://github.com/username/repo format, compiled once and reused
+_GH_RE = re.compile(r'https?://github\.com/[\w-]+/[\w.-]+')
+
 def extract_github_link(text):
     """Extract the first GitHub link from text"""
-    # match https://github.com/username/repo format
-    pattern = r'(https?://github\.com/[\w-]+/[\w.-]+)'
-    match = re.search(pattern, text)
+    match = _GH_RE.search(text)
     if match:
-        return match.group(1)
+        return match.group(0)
     return None
 
 def generate_markdown_entry(paper):
     """Generate markdown entry for a single paper"""
-    # try to extract code link from summary or title
-    code_link = extract_github_link(paper['summary'])
-    if not code_link:
-        code_link = extract_github_link(paper['title'])
+    # try to extract code link from summary or title in a single scan
+    code_link = extract_github_link(paper['summary'] + '\n' + paper['title'])
     if not code_link:
         code_link = "N/A"
     else:
@@ -39,14 +66,15 @@ def generate_markdown_entry(paper):
 
     # Clean abstract
     abstract = paper['summary'].replace('\n', ' ').strip()
-    
-    md = f"### [{paper['title']}]({paper['link']})\n"
-    md += f"- **Date**: {paper['published']}\n"
-    md += f"- **Code**: {code_link}\n"
-    md += f"- **Abstract**:\n"
-    md += f"  > {abstract}\n"
-    
-    return md
+
+    return "\n".join([
+        f"### [{paper['title']}]({paper['link']})",
+        f"- **Date**: {paper['published']}",
+        f"- **Code**: {code_link}",
+        "- **Abstract**:",
+        f"  > {abstract}",
+        "",
+    ])
 
 def update_readme(target_dir, new_content, date_str):
     """Update README.md with new content"""
@@ -55,39 +83,61 @@ def update_readme(target_dir, new_content, date_str):
     # If file doesn't exist, initialize it
     if not os.path.exists(readme_path):
         with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(f"# Awesome Flow Matching & Diffusion Models (Daily)\n\n")
-            f.write(f"Updated daily via automated scripts.\n\n")
-            f.write(f"## 📅 Latest Updates ({date_str})\n\n")
-            f.write("\n")
-            f.write("\n\n")
-            f.write(f"## 🗄️ Archives\n\n")
-            f.write(f"- [2026 Archives](./archives/)\n")
-
-    with open(readme_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+            f.write("".join([
+                f"# Awesome Flow Matching & Diffusion Models (Daily)\n\n",
+                f"Updated daily via automated scripts.\n\n",
+                f"## 📅 Latest Updates ({date_str})\n\n",
+                "\n",
+                "\n\n",
+                f"## 🗄️ Archives\n\n",
+                f"- [2026 Archives](./archives/)\n",
+            ]))
 
     # Replace the content between markers
     # Here we keep the header, insert new content after START marker, push old content down,
     # but keep README short by only showing "today's updates", with history in archives.
     # Below logic replaces the "today's updates" section.
-    
-    start_marker = "<!-- START LATEST -->"
-    end_marker = "<!-- END LATEST -->"
-    
-    if start_marker not in content or end_marker not in content:
-        # If markers not found, append new content
-        new_readme = content + f"\n\n## {date_str}\n{new_content}"
-    else:
-        # Replace middle part
-        pattern = re.compile(f"{re.escape(start_marker)}.*?{re.escape(end_marker)}", re.DOTALL)
-        replacement = f"{start_marker}\n{new_content}\n{end_marker}"
-        new_readme = pattern.sub(replacement, content)
-        
-        # Update title with new date
-        new_readme = re.sub(r"Latest Updates \(.*?\)", f"Latest Updates ({date_str})", new_readme)
-
-    with open(readme_path, 'w', encoding='utf-8') as f:
-        f.write(new_readme)
+    # The file is spliced via mmap so an unchanged-size update rewrites
+    # only the affected bytes instead of the whole README.
+
+    start_marker = b"<!-- START LATEST -->"
+    end_marker = b"<!-- END LATEST -->"
+    new_section = start_marker + b"\n" + new_content.encode('utf-8') + b"\n" + end_marker
+
+    with open(readme_path, 'r+b') as f:
+        start = end = -1
+        head = tail = None
+        spliced = False
+        if os.path.getsize(readme_path) > 0:
+            with mmap.mmap(f.fileno(), 0) as mm:
+                start = mm.find(start_marker)
+                end = mm.find(end_marker)
+                if start != -1 and end != -1:
+                    end += len(end_marker)
+                    # Update title with new date in the same scan
+                    head = re.sub(rb"Latest Updates \(.*?\)",
+                                  f"Latest Updates ({date_str})".encode('utf-8'), mm[:start])
+                    if len(head) == start and len(new_section) == end - start:
+                        # Same size: splice in place, no rewrite of the tail
+                        mm[:start] = head
+                        mm[start:end] = new_section
+                        mm.flush()
+                        spliced = True
+                    else:
+                        tail = mm[end:]
+
+        # Writes through f only happen once the map above is closed -
+        # truncating a mapped file is forbidden on some platforms
+        if spliced:
+            pass
+        elif start == -1 or end == -1:
+            # If markers not found, append new content
+            f.seek(0, os.SEEK_END)
+            f.write(f"\n\n## {date_str}\n{new_content}".encode('utf-8'))
+        else:
+            f.seek(0)
+            f.write(head + new_section + tail)
+            f.truncate()
     print(f"✅ Updated README.md")
 
 def update_archive(target_dir, papers, date_str):
@@ -98,15 +148,14 @@ def update_archive(target_dir, papers, date_str):
     
     archive_file = os.path.join(archive_dir, f"{year_month}.md")
     
-    # Generate markdown content for new papers
-    append_content = f"\n## {date_str} (Total: {len(papers)})\n\n"
-    for paper in papers:
-        append_content += generate_markdown_entry(paper) + "\n---\n"
+    # Write entries straight through a large buffer instead of building
+    # the whole section as one string first
+    with open(archive_file, 'a', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(f"\n## {date_str} (Total: {len(papers)})\n\n")
+        for paper in papers:
+            f.write(generate_markdown_entry(paper))
+            f.write("\n---\n")
 
-    # Append to file
-    with open(archive_file, 'a', encoding='utf-8') as f:
-        f.write(append_content)
-    
     print(f"✅ Updated Archive: {archive_file}")
 
 # --- 3. main ---
@@ -135,7 +184,8 @@ def main():
         keywords=keywords,
         start_date=start_date_str,
         end_date=end_date_str,
-        max_results=50  # daily usually won't exceed 50 relevant papers
+        max_results=50,  # daily usually won't exceed 50 relevant papers
+        build_formatted=False  # markdown entries only use title/link/date/abstract
     )
     
     if not papers:
@@ -143,16 +193,26 @@ def main():
         # even without papers, don't exit with error to prevent CI failure
         return
 
+    # only process papers not already published by a previous run
+    seen = load_seen_ids(args.output_dir)
+    papers = [paper for paper in papers if paper['id'] not in seen]
+
+    if not papers:
+        print("⚠️ No new papers since the last run. Exiting.")
+        return
+
     print(f"📦 Found {len(papers)} papers. Processing...")
 
     # Generate markdown content for new papers
-    md_content = ""
-    for paper in papers:
-        md_content += generate_markdown_entry(paper) + "\n---\n"
+    md_content = "".join(generate_markdown_entry(paper) + "\n---\n" for paper in papers)
 
     # Update Target Repo's files
     update_readme(args.output_dir, md_content, end_date_str)
     update_archive(args.output_dir, papers, end_date_str)
 
+    # record the ids only after the files were written successfully
+    seen.update({paper['id']: paper['published'] for paper in papers})
+    save_seen_ids(args.output_dir, seen)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file